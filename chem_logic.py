@@ -0,0 +1,96 @@
+# Pure chemistry logic behind the calculator screens, kept free of Kivy
+import bisect
+import functools
+import re
+
+# Bond type by EN difference: below 0.4, below 1.7, 1.7 and above
+BOND_CUTOFFS = (0.4, 1.7)
+BOND_TYPES = ("non-polar covalent", "polar covalent", "ionic")
+
+# molmass builds its element table on import, so it is loaded lazily (the app
+# preloads it on a background thread) to keep startup fast
+@functools.lru_cache(maxsize=None)
+def electronegativity_table():
+    # Flat symbol -> electronegativity table, built once
+    from molmass import elements
+    return {el.symbol: el.eleneg for el in elements.ELEMENTS}
+
+@functools.lru_cache(maxsize=None)
+def element_pattern():
+    # Longest symbols first so the scan prefers e.g. "Cl" over "C"
+    return re.compile('|'.join(sorted(electronegativity_table(), key=len, reverse=True)), re.IGNORECASE | re.ASCII)
+
+def get_electronegativity(element_symbol):
+    # Expects a capitalized symbol as produced by split_elements
+    return electronegativity_table().get(element_symbol)  # None if the element symbol is not valid
+
+@functools.lru_cache(maxsize=512)
+def molecular_mass(input_text):
+    # Invalid input raises, so only successful results are cached
+    from molmass import Formula
+    total_mass = 0
+    # Split the input text into components
+    components = re.findall(r'(\d*\(*[A-Za-z\(][A-Za-z0-9\(\)]*\)*)', input_text)
+    for component in components:
+        # Check if the component starts with a digit (coefficient)
+        match = re.match(r"(\d+)([A-Za-z\(].*)", component)
+        if match:
+            coefficient, compound = match.groups()
+            coefficient = int(coefficient)
+        else:
+            coefficient = 1
+            compound = component
+
+        # Handle nested parentheses
+        while '(' in compound and ')' in compound:
+            innermost = re.search(r'\(([A-Za-z0-9]*)\)', compound).group(1)
+            compound = compound.replace(f'({innermost})', innermost, 1)
+
+        f = Formula(compound)
+        total_mass += f.mass * coefficient
+    return total_mass
+
+def scan_elements(compound):
+    # Slice-by-slice scan for non-ASCII input, where capitalize() can fold
+    # characters into symbols (e.g. 'ſ' -> 'S') that the regex would miss
+    elements = []
+    i = 0
+    while i < len(compound):
+        # Check for a two-letter element symbol first
+        if i + 1 < len(compound):
+            symbol = compound[i:i+2].capitalize()
+            if get_electronegativity(symbol) is not None:
+                elements.append(symbol)
+                i += 2
+                continue
+        # Check for a one-letter element symbol
+        symbol = compound[i].capitalize()
+        if get_electronegativity(symbol) is not None:
+            elements.append(symbol)
+        i += 1
+    return elements
+
+def split_elements(compound):
+    if compound.isascii():
+        elements = [symbol.capitalize() for symbol in element_pattern().findall(compound)]
+    else:
+        elements = scan_elements(compound)
+    # If the compound is two characters long and only one element was found, split into two one-letter elements
+    if len(compound) == 2 and len(elements) == 1:
+        elements = [compound[0].capitalize(), compound[1].capitalize()]
+    return elements
+
+@functools.lru_cache(maxsize=512)
+def electronegativity_difference(input_text):
+    # Returns None unless exactly two elements are found; raises ValueError
+    # (never cached) if either element has no electronegativity
+    elements = split_elements(input_text)
+    if len(elements) != 2:
+        return None
+    en1 = get_electronegativity(elements[0])
+    en2 = get_electronegativity(elements[1])
+    if en1 is None or en2 is None:
+        raise ValueError("Invalid input.")
+    en_difference = abs(en1 - en2)
+    bond_type = BOND_TYPES[bisect.bisect_right(BOND_CUTOFFS, en_difference)]
+    return elements[0], elements[1], en1, en2, en_difference, bond_type